@@ -1,16 +1,13 @@
 from fastapi import FastAPI, UploadFile, File, Form
 from fastapi.responses import HTMLResponse, JSONResponse
 from typing import Optional
-import base64, cv2
 
 from .schemas import AnalyzeResponse, Calibration
-from .preprocess import preprocess_any
-from .inference import run_front_pipeline, run_side_pipeline
-from .qc import run_qc
 from .metrics import front_metrics, side_metrics
 from .scoring import score
 from .report import make_pdf
 from .llm_client import summarize_with_llm
+from .pipeline import ViewScheduler, front_view_job, side_view_job
 
 app = FastAPI(title="UBAS Anthropometry", version="1.0.0")
 
@@ -23,50 +20,43 @@ def ui():
     html = open(__file__.replace("main.py", " ../static/index.html").replace(" ", "")).read()
     return HTMLResponse(html)
 
-def _to_b64(img):
-    _, buf = cv2.imencode(".png", img)
-    return base64.b64encode(buf).decode("utf-8")
-
 @app.post("/analyze-multi")
 async def analyze_multi(
-    pre_front: UploadFile = File(..., description="Pre-op both eyes, front"),
-    post_front: UploadFile = File(..., description="Post-op both eyes, front"),
+    pre_front: UploadFile = File(..., description="Pre-op both eyes, front (photo or short video)"),
+    post_front: UploadFile = File(..., description="Post-op both eyes, front (photo or short video)"),
     pre_side: Optional[UploadFile] = File(None, description="Pre-op side (optional)"),
     post_side: Optional[UploadFile] = File(None, description="Post-op side (optional)"),
     use_sticker: bool = Form(False),
     sticker_px: Optional[float] = Form(None),
     sticker_mm: float = Form(10.0),
-    iris_diam_mm: float = Form(11.8)
+    iris_diam_mm: float = Form(11.8),
+    per_view_qc: bool = Form(False)
 ):
-    # 1) Auto-crop to standardized frames
-    pf_img, pf_meta = preprocess_any(await pre_front.read(), view="front")
-    qf_img, qf_meta = preprocess_any(await post_front.read(), view="front")
-    ps_img, ps_meta = (None, None)
-    qs_img, qs_meta = (None, None)
-    if pre_side is not None:
-        ps_img, ps_meta = preprocess_any(await pre_side.read(), view="side")
-    if post_side is not None:
-        qs_img, qs_meta = preprocess_any(await post_side.read(), view="side")
-
-    # 2) Landmarking/segmentation on cropped images
-    pf_b64 = _to_b64(pf_img); qf_b64 = _to_b64(qf_img)
-    f_img0, f_lm_pre, roll_pre = run_front_pipeline(pf_b64)
-    f_img1, f_lm_post, roll_post = run_front_pipeline(qf_b64)
+    with ViewScheduler() as views:
+        # 1) Crop + landmark every view off the request thread. Post-op front goes first
+        #    (front views may be short videos) and carries the accept/reject QC.
+        views.submit("post_front", front_view_job, post_front, True, gate=True)
+        views.submit("pre_front", front_view_job, pre_front, per_view_qc)
+        if pre_side is not None:
+            views.submit("pre_side", side_view_job, pre_side, per_view_qc)
+        if post_side is not None:
+            views.submit("post_side", side_view_job, post_side, per_view_qc)
 
-    s_metrics_pre = None; s_metrics_post = None
-    if ps_img is not None:
-        s_img0, s_feat_pre = run_side_pipeline(_to_b64(ps_img))
-        s_metrics_pre = side_metrics(s_feat_pre)
-    if qs_img is not None:
-        s_img1, s_feat_post = run_side_pipeline(_to_b64(qs_img))
-        s_metrics_post = side_metrics(s_feat_post)
+        # 2) QC gate: a failing view cancels and frees whatever is still queued or running
+        post = await views.result("post_front")
+        if not post.qc.passed:
+            return {"qc": post.qc.dict(), "view": "post_front", "message": "Retake required", "overlays": None}
+        done = {"post_front": post}
+        async for res in views.as_completed():
+            if res.qc is not None and not res.qc.passed:
+                return {"qc": res.qc.dict(), "view": res.name, "message": "Retake required", "overlays": None}
+            done[res.name] = res
 
-    # 3) QC (use post front for accept)
-    qc = run_qc(cv2.cvtColor(f_img1, cv2.COLOR_BGR2GRAY),
-                cv2.cvtColor(f_img1, cv2.COLOR_BGR2GRAY),
-                f_lm_post, roll_post)
-    if not qc.passed:
-        return {"qc": qc.dict(), "message": "Retake required", "overlays": None}
+    # 3) Side metrics
+    pre, qc = done["pre_front"], post.qc
+    f_lm_pre, f_lm_post = pre.features, post.features
+    s_metrics_pre = side_metrics(done["pre_side"].features) if "pre_side" in done else None
+    s_metrics_post = side_metrics(done["post_side"].features) if "post_side" in done else None
 
     # 4) Calibration config
     calib_mode = "sticker" if use_sticker and sticker_px else "iris"
@@ -103,8 +93,10 @@ async def analyze_multi(
         "ai_summary": ai_summary,
         "scale_mm_per_px_post": mm_px_post,
         "debug_overlays": {
-            "pre_front_crop_png_b64": pf_b64,
-            "post_front_crop_png_b64": qf_b64
+            "pre_front_crop_png_b64": pre.crop_b64,
+            "post_front_crop_png_b64": post.crop_b64
         },
+        "video_frames": {"pre_front": pre.video, "post_front": post.video},
+        "view_qc": {name: r.qc.dict() for name, r in done.items() if r.qc is not None},
         "pdf_report_b64": pdf_b64
     }
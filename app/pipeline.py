@@ -0,0 +1,131 @@
+import asyncio, base64, threading
+import cv2, numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from fastapi import UploadFile
+
+from .schemas import QCResult
+from .preprocess import preprocess_any
+from .inference import run_front_pipeline, run_side_pipeline
+from .qc import run_qc, run_res_qc, run_side_qc
+from .video import is_video, run_front_video_pipeline
+
+# Shared by all requests so concurrent uploads never run more than this many view jobs at once.
+# QC-gate views get their own small pool so a retake verdict never queues behind other
+# requests' bulk views (e.g. 60-frame videos); gates still queue behind other requests' gates.
+MAX_VIEW_WORKERS = 2
+MAX_GATE_WORKERS = 1
+_view_pool = ThreadPoolExecutor(max_workers=MAX_VIEW_WORKERS, thread_name_prefix="ubas-view")
+_gate_pool = ThreadPoolExecutor(max_workers=MAX_GATE_WORKERS, thread_name_prefix="ubas-gate")
+
+def _to_b64(img):
+    _, buf = cv2.imencode(".png", img)
+    return base64.b64encode(buf).decode("utf-8")
+
+class ViewCancelled(RuntimeError):
+    pass
+
+class ViewResult(NamedTuple):
+    name: str
+    crop_b64: Optional[str]        # None when rejected before landmarking
+    img: np.ndarray
+    features: Any                  # LandmarkSet (front) or SideFeatures (side)
+    pose_deg: Optional[float]      # head roll (front) or head yaw (side)
+    qc: Optional[QCResult] = None
+    video: Optional[dict] = None
+
+def _read_upload(upload: UploadFile) -> bytes:
+    upload.file.seek(0)
+    return upload.file.read()
+
+def front_view_job(name: str, upload: UploadFile, with_qc: bool,
+                   check: Callable[[], None]) -> ViewResult:
+    # Still photo: crop + static landmarking. Short video: track, QC per frame, fuse best frames.
+    check()
+    stats = None
+    if is_video(upload.content_type, upload.filename):
+        img, lm, roll, stats = run_front_video_pipeline(upload.file, upload.filename, check=check)
+        b64 = _to_b64(img)
+        if lm is None:
+            # Never score placeholder geometry: an untracked clip is a retake for any view
+            qc = QCResult(passed=False, reasons=["No face tracked in video."])
+            return ViewResult(name, b64, img, None, None, qc, stats)
+        if with_qc:
+            qc = run_res_qc(stats["orig_hw"])
+            if not qc.passed:
+                return ViewResult(name, b64, img, None, None, qc, stats)
+    else:
+        crop, meta = preprocess_any(_read_upload(upload), view="front")
+        if with_qc:
+            qc = run_res_qc(meta["orig_hw"])
+            if not qc.passed:
+                return ViewResult(name, None, crop, None, None, qc)
+        check()
+        b64 = _to_b64(crop)
+        img, lm, roll = run_front_pipeline(b64)
+    check()
+    qc = run_qc(lm, roll) if with_qc else None
+    return ViewResult(name, b64, img, lm, roll, qc, stats)
+
+def side_view_job(name: str, upload: UploadFile, with_qc: bool,
+                  check: Callable[[], None]) -> ViewResult:
+    check()
+    crop, meta = preprocess_any(_read_upload(upload), view="side")
+    yaw = meta["yaw_deg"]
+    qc = None
+    if with_qc:
+        qc = run_side_qc(meta["orig_hw"], yaw, meta["eye_area_ratio"])
+        if not qc.passed:
+            return ViewResult(name, None, crop, None, yaw, qc)
+    check()
+    b64 = _to_b64(crop)
+    img, sf = run_side_pipeline(b64)
+    return ViewResult(name, b64, img, sf, yaw, qc)
+
+class ViewScheduler:
+    """Runs one request's per-view jobs on the shared view pool so a failing QC view can stop the rest.
+
+    Jobs receive a `check` callable and call it between stages; after `cancel()`
+    this request's queued jobs are dropped from the pool and running ones raise
+    ViewCancelled at their next stage, dropping their intermediate images. Use
+    as a context manager so any early return or error cancels whatever is
+    still outstanding.
+    """
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._futures: Dict[str, asyncio.Future] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cancel()
+
+    def check(self):
+        if self._cancelled.is_set():
+            raise ViewCancelled()
+
+    def submit(self, name: str, job: Callable[..., ViewResult], *args, gate: bool = False):
+        # The QC gate view runs on the gate pool; the rest start in submission order
+        loop = asyncio.get_running_loop()
+        pool = _gate_pool if gate else _view_pool
+        self._futures[name] = loop.run_in_executor(pool, job, name, *args, self.check)
+
+    async def result(self, name: str) -> ViewResult:
+        return await self._futures.pop(name)
+
+    async def as_completed(self):
+        while self._futures:
+            done, _ = await asyncio.wait(list(self._futures.values()),
+                                         return_when=asyncio.FIRST_COMPLETED)
+            for name in [n for n, f in self._futures.items() if f in done]:
+                yield self._futures.pop(name).result()
+
+    def cancel(self):
+        # Cancelling the asyncio future also cancels the pool future if it has not started yet
+        self._cancelled.set()
+        for fut in self._futures.values():
+            fut.cancel()
+        self._futures.clear()
@@ -11,27 +11,35 @@ def _to_bgr(img_bytes: bytes) -> np.ndarray:
         raise ValueError("Invalid image data")
     return im
 
-def _face_mesh_landmarks_both_eyes(img_bgr: np.ndarray) -> Optional[dict]:
+def _face_mesh_landmarks_both_eyes(img_bgr: np.ndarray, fm=None) -> Optional[dict]:
     # Returns centers and bounds for both eyes using Face Mesh indices
-    with mp_face_mesh.FaceMesh(static_image_mode=True, max_num_faces=1, refine_landmarks=True) as fm:
-        h, w = img_bgr.shape[:2]
-        rgb = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
-        res = fm.process(rgb)
-        if not res.multi_face_landmarks:
-            return None
-        lm = res.multi_face_landmarks[0].landmark
+    if fm is None:
+        # One-shot static graph; callers scanning many frames pass in their own
+        with mp_face_mesh.FaceMesh(static_image_mode=True, max_num_faces=1, refine_landmarks=True) as fm:
+            return _face_mesh_landmarks_both_eyes(img_bgr, fm)
+    h, w = img_bgr.shape[:2]
+    rgb = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
+    res = fm.process(rgb)
+    if not res.multi_face_landmarks:
+        return None
+    lm = res.multi_face_landmarks[0].landmark
+
+    LEFT_EYE_IDXS  = [33, 133, 159, 145, 246, 161, 163, 7]
+    RIGHT_EYE_IDXS = [362, 263, 386, 374, 466, 388, 390, 249]
 
-        LEFT_EYE_IDXS  = [33, 133, 159, 145, 246, 161, 163, 7]
-        RIGHT_EYE_IDXS = [362, 263, 386, 374, 466, 388, 390, 249]
+    def pts(idx_list):
+        pts = np.array([(lm[i].x*w, lm[i].y*h) for i in idx_list], dtype=np.float32)
+        cx, cy = pts[:,0].mean(), pts[:,1].mean()
+        x0, y0 = pts[:,0].min(), pts[:,1].min()
+        x1, y1 = pts[:,0].max(), pts[:,1].max()
+        return {"cx": cx, "cy": cy, "bbox": (x0, y0, x1, y1), "poly": pts}
 
-        def pts(idx_list):
-            pts = np.array([(lm[i].x*w, lm[i].y*h) for i in idx_list], dtype=np.float32)
-            cx, cy = pts[:,0].mean(), pts[:,1].mean()
-            x0, y0 = pts[:,0].min(), pts[:,1].min()
-            x1, y1 = pts[:,0].max(), pts[:,1].max()
-            return {"cx": cx, "cy": cy, "bbox": (x0, y0, x1, y1), "poly": pts}
+    # Head yaw from the depth offset between outer canthi (~0° frontal, ~90° true profile)
+    dx = abs(lm[263].x - lm[33].x)
+    dz = abs(lm[263].z - lm[33].z)
+    yaw_deg = float(np.degrees(np.arctan2(dz, dx)))
 
-        return {"L": pts(LEFT_EYE_IDXS), "R": pts(RIGHT_EYE_IDXS)}
+    return {"L": pts(LEFT_EYE_IDXS), "R": pts(RIGHT_EYE_IDXS), "yaw_deg": yaw_deg}
 
 def _expand_bbox(bbox, scale: float, w: int, h: int):
     x0,y0,x1,y1 = bbox
@@ -41,13 +49,14 @@ def _expand_bbox(bbox, scale: float, w: int, h: int):
     y0n, y1n = int(max(0, cy-bh/2)), int(min(h, cy+bh/2))
     return x0n, y0n, x1n, y1n
 
-def crop_front_both_eyes(img_bgr: np.ndarray, target=(640, 640)) -> Tuple[np.ndarray, dict]:
+def crop_front_both_eyes(img_bgr: np.ndarray, target=(640, 640), fm=None) -> Tuple[np.ndarray, dict]:
     h, w = img_bgr.shape[:2]
-    info = _face_mesh_landmarks_both_eyes(img_bgr)
+    info = _face_mesh_landmarks_both_eyes(img_bgr, fm)
     if info is None:
         side = min(h, w)
         x0 = (w - side)//2; y0 = (h - side)//2
-        crop = img_bgr[y0:y0+side, x0:x0+side]
+        x1, y1 = x0+side, y0+side
+        crop = img_bgr[y0:y1, x0:x1]
     else:
         L, R = info["L"]["bbox"], info["R"]["bbox"]
         x0 = int(min(L[0], R[0])); y0 = int(min(L[1], R[1]))
@@ -56,7 +65,8 @@ def crop_front_both_eyes(img_bgr: np.ndarray, target=(640, 640)) -> Tuple[np.nda
         crop = img_bgr[y0:y1, x0:x1]
 
     crop_res = cv2.resize(crop, target, interpolation=cv2.INTER_AREA)
-    return crop_res, {"crop_xyxy": (x0, y0, x1, y1), "orig_hw": (h, w), "target": target}
+    return crop_res, {"crop_xyxy": (x0, y0, x1, y1), "orig_hw": (h, w), "target": target,
+                      "face_found": info is not None}
 
 def crop_side_single_eye(img_bgr: np.ndarray, target=(640, 640)) -> Tuple[np.ndarray, dict]:
     h, w = img_bgr.shape[:2]
@@ -66,17 +76,26 @@ def crop_side_single_eye(img_bgr: np.ndarray, target=(640, 640)) -> Tuple[np.nda
         x0 = (w - side)//2; y0 = (h - side)//2
         crop = img_bgr[y0:y0+side, x0:x0+side]
         crop_res = cv2.resize(crop, target, interpolation=cv2.INTER_AREA)
-        return crop_res, {"crop_xyxy": (x0, y0, x0+side, y0+side), "orig_hw": (h, w), "target": target}
+        return crop_res, {"crop_xyxy": (x0, y0, x0+side, y0+side), "orig_hw": (h, w), "target": target,
+                          "yaw_deg": None, "eye_area_ratio": None}
 
     areas = {}
     for k in ("L","R"):
         x0,y0,x1,y1 = info[k]["bbox"]
         areas[k] = (x1-x0)*(y1-y0)
     visible = "L" if areas["L"] >= areas["R"] else "R"
+    # Far eye shrinks (foreshortening) as the head turns to profile
+    eye_area_ratio = float(min(areas.values()) / max(areas.values())) if max(areas.values()) > 0 else 0.0
     x0,y0,x1,y1 = _expand_bbox(info[visible]["bbox"], scale=4.0, w=w, h=h)
     crop = img_bgr[y0:y1, x0:x1]
     crop_res = cv2.resize(crop, target, interpolation=cv2.INTER_AREA)
-    return crop_res, {"eye": visible, "crop_xyxy": (x0, y0, x1, y1), "orig_hw": (h, w), "target": target}
+    return crop_res, {"eye": visible, "crop_xyxy": (x0, y0, x1, y1), "orig_hw": (h, w), "target": target,
+                      "yaw_deg": info["yaw_deg"], "eye_area_ratio": eye_area_ratio}
+
+def apply_crop(img_bgr: np.ndarray, crop_xyxy, target=(640, 640)) -> np.ndarray:
+    # Re-use a crop box found on an earlier frame (video input) without another detection pass
+    x0,y0,x1,y1 = crop_xyxy
+    return cv2.resize(img_bgr[y0:y1, x0:x1], target, interpolation=cv2.INTER_AREA)
 
 def preprocess_any(img_bytes: bytes, view: str):
     bgr = _to_bgr(img_bytes)
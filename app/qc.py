@@ -1,5 +1,5 @@
 import numpy as np
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from .schemas import LandmarkSet, QCResult
 
 def _primary_gaze(landmarks: LandmarkSet, can_thresh_deg=3.0) -> bool:
@@ -11,14 +11,41 @@ def _primary_gaze(landmarks: LandmarkSet, can_thresh_deg=3.0) -> bool:
 def _head_roll_ok(face_pose_deg: float, limit=3.0) -> bool:
     return abs(face_pose_deg) <= limit
 
-def run_qc(front_gray, side_gray, front_lm: LandmarkSet, face_roll_deg: float,
-           min_res=(480, 480)) -> QCResult:
+def _lateral_view_ok(side_yaw_deg: float, eye_area_ratio: Optional[float],
+                     min_yaw=45.0, max_area_ratio=0.5) -> bool:
+    return abs(side_yaw_deg) >= min_yaw or (eye_area_ratio is not None and eye_area_ratio <= max_area_ratio)
+
+def _source_res_ok(orig_hw, min_res=(480, 480)) -> bool:
+    # Crops are always resized to 640×640, so judge the original upload (preprocess meta)
+    h, w = orig_hw
+    return h >= min_res[0] and w >= min_res[1]
+
+def run_res_qc(orig_hw, min_res=(480, 480)) -> QCResult:
+    reasons: List[str] = []
+    if not _source_res_ok(orig_hw, min_res):
+        reasons.append("Low resolution: need ≥ 480×480.")
+    return QCResult(passed=(len(reasons)==0), reasons=reasons)
+
+def run_qc(front_lm: LandmarkSet, face_roll_deg: float) -> QCResult:
+    reasons: List[str] = []
+    if not front_lm.confidences:
+        # run_front_pipeline's no-face placeholder: its flat geometry would pass the pose checks
+        reasons.append("No face detected in front view.")
+    else:
+        if not _primary_gaze(front_lm):
+            reasons.append("Eye not in primary gaze (canthal line not horizontal).")
+        if not _head_roll_ok(face_roll_deg):
+            reasons.append("Head tilt > 3°.")
+    return QCResult(passed=(len(reasons)==0), reasons=reasons)
+
+def run_side_qc(orig_hw, side_yaw_deg: Optional[float], eye_area_ratio: Optional[float],
+                min_res=(480, 480)) -> QCResult:
+    # Everything here comes from preprocess meta, so it runs before side landmarking
     reasons: List[str] = []
-    h, w = front_gray.shape[:2]
-    if h < min_res[0] or w < min_res[1]:
+    if not _source_res_ok(orig_hw, min_res):
         reasons.append("Low resolution: need ≥ 480×480.")
-    if not _primary_gaze(front_lm):
-        reasons.append("Eye not in primary gaze (canthal line not horizontal).")
-    if not _head_roll_ok(face_roll_deg):
-        reasons.append("Head tilt > 3°.")
+    if side_yaw_deg is None:
+        reasons.append("No face detected in side view.")
+    elif not _lateral_view_ok(side_yaw_deg, eye_area_ratio):
+        reasons.append("Side view not lateral enough (head yaw < 45°, both eyes equally visible).")
     return QCResult(passed=(len(reasons)==0), reasons=reasons)
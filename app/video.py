@@ -0,0 +1,158 @@
+import heapq, os, shutil, tempfile
+import cv2, numpy as np
+from typing import Callable, Iterator, List, Optional
+import mediapipe as mp
+
+from .schemas import LandmarkSet
+from .preprocess import crop_front_both_eyes, apply_crop
+from .inference import front_landmarks_from_mesh
+from .qc import run_qc
+
+mp_face_mesh = mp.solutions.face_mesh
+
+VIDEO_EXTS = (".mp4", ".mov", ".m4v", ".avi", ".webm", ".mkv")
+
+def is_video(content_type: Optional[str], filename: Optional[str]) -> bool:
+    if content_type and content_type.startswith("video/"):
+        return True
+    return bool(filename) and filename.lower().endswith(VIDEO_EXTS)
+
+def _spool_to_tempfile(fileobj, suffix: str) -> str:
+    # OpenCV decodes from a path; copy in chunks so the clip is never held in memory at once
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            fileobj.seek(0)
+            shutil.copyfileobj(fileobj, out, 1 << 20)
+    except BaseException:
+        # e.g. the upload was closed under a cancelled job; don't leak the temp file
+        os.remove(path)
+        raise
+    return path
+
+def iter_frames(path: str, sample_fps: float = 10.0, max_frames: int = 60) -> Iterator[np.ndarray]:
+    # Streams decoded frames one at a time, sub-sampled to ~sample_fps and capped at max_frames
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        cap.release()
+        raise ValueError("Invalid video data")
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        # Some containers (WebM/MKV) report bogus rates like 1000 fps; keep the stride sane
+        fps = min(max(fps, 1.0), 120.0)
+        stride = max(1, int(round(fps / sample_fps)))
+        i = n = 0
+        while n < max_frames and cap.grab():
+            if i % stride == 0:
+                ok, frame = cap.retrieve()
+                if not ok:
+                    break
+                yield frame
+                n += 1
+            i += 1
+    finally:
+        cap.release()
+
+def fuse_landmarks(lms: List[LandmarkSet]) -> LandmarkSet:
+    # Point-wise mean; all inputs come from the same crop box and Face Mesh topology
+    def mean_poly(polys):
+        return [tuple(p) for p in np.mean(np.array(polys, dtype=np.float64), axis=0).tolist()]
+
+    def mean_pt(pts):
+        return tuple(np.mean(np.array(pts, dtype=np.float64), axis=0).tolist())
+
+    return LandmarkSet(
+        upper_lid=mean_poly([l.upper_lid for l in lms]),
+        lower_lid=mean_poly([l.lower_lid for l in lms]),
+        lash_line=mean_poly([l.lash_line for l in lms]),
+        crease_line=mean_poly([l.crease_line for l in lms]),
+        brow_curve=mean_poly([l.brow_curve for l in lms]),
+        medial_canthus=mean_pt([l.medial_canthus for l in lms]),
+        lateral_canthus=mean_pt([l.lateral_canthus for l in lms]),
+        iris_center=mean_pt([l.iris_center for l in lms]),
+        iris_radius=float(np.mean([l.iris_radius for l in lms])),
+        confidences={"mediapipe": 1.0, "frames_fused": float(len(lms))}
+    )
+
+def run_front_video_pipeline(fileobj, filename: Optional[str] = None,
+                             top_k: int = 5, sample_fps: float = 10.0, max_frames: int = 60,
+                             max_detect_attempts: int = 5,
+                             check: Optional[Callable[[], None]] = None):
+    """Track a short front-view clip, QC every sampled frame and fuse the best ones.
+
+    Full-frame face detection (to place the eye crop) is retried on at most
+    `max_detect_attempts` frames before the clip is given up as untracked.
+    `check` is called before each frame and may raise to abandon the clip early.
+    Returns (crop of best frame, fused LandmarkSet, mean head roll, frame stats);
+    landmarks and roll are None when no sampled frame had a trackable face.
+    """
+    suffix = os.path.splitext(filename or "")[1] or ".mp4"
+    path = _spool_to_tempfile(fileobj, suffix)
+
+    best = []  # min-heap of (rank, idx, passed, lm, roll), bounded to top_k
+    best_rank, best_img, last_img = None, None, None
+    crop_xyxy, orig_hw = None, None
+    decoded = tracked = passed = detect_attempts = 0
+    frames = iter_frames(path, sample_fps, max_frames)
+    try:
+        # One static graph for the clip's crop detection; tracking mode for the per-frame landmarks
+        with mp_face_mesh.FaceMesh(static_image_mode=True, max_num_faces=1, refine_landmarks=True) as detector, \
+             mp_face_mesh.FaceMesh(static_image_mode=False, max_num_faces=1, refine_landmarks=True,
+                                   min_detection_confidence=0.5, min_tracking_confidence=0.5) as fm:
+            for idx, frame in enumerate(frames):
+                if check is not None:
+                    check()
+                decoded += 1
+                if crop_xyxy is None:
+                    if detect_attempts >= max_detect_attempts:
+                        break
+                    detect_attempts += 1
+                    img, meta = crop_front_both_eyes(frame, target=(640,640), fm=detector)
+                    last_img, orig_hw = img, meta["orig_hw"]
+                    if not meta["face_found"]:
+                        continue
+                    crop_xyxy = meta["crop_xyxy"]
+                else:
+                    img = apply_crop(frame, crop_xyxy, target=(640,640))
+                last_img = img
+                h, w = img.shape[:2]
+
+                res = fm.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+                if not res.multi_face_landmarks:
+                    # Keep the crop fixed once a face is tracked so fused landmarks share coordinates
+                    if not tracked:
+                        crop_xyxy = None
+                    continue
+                tracked += 1
+
+                lm, roll = front_landmarks_from_mesh(res.multi_face_landmarks[0].landmark, w, h)
+                qc = run_qc(lm, roll)
+                passed += int(qc.passed)
+
+                rank = (-len(qc.reasons), -abs(roll))
+                item = (rank, idx, qc.passed, lm, roll)
+                if len(best) < top_k:
+                    heapq.heappush(best, item)
+                else:
+                    heapq.heappushpop(best, item)
+                if best_rank is None or rank > best_rank:
+                    best_rank, best_img = rank, img
+    finally:
+        frames.close()
+        os.remove(path)
+
+    if last_img is None:
+        raise ValueError("Invalid video data")
+
+    stats = {"frames_decoded": decoded, "frames_tracked": tracked, "detect_attempts": detect_attempts,
+             "frames_passed_qc": passed, "frames_fused": 0,
+             "crop_xyxy": crop_xyxy, "orig_hw": orig_hw}
+    if not best:
+        return last_img, None, None, stats
+
+    ranked = sorted(best, reverse=True)
+    chosen = [it for it in ranked if it[2]] or ranked[:1]
+    stats["frames_fused"] = len(chosen)
+    fused = fuse_landmarks([it[3] for it in chosen])
+    roll = float(np.mean([it[4] for it in chosen]))
+    return best_img, fused, roll, stats